@@ -1,16 +1,36 @@
 import argparse
+import codecs
 import csv
 import functools
+import io
 import itertools
+import mmap
+import multiprocessing
 import os
+import pickle
+import re
 import sys
-from typing import Dict, List, Iterable
+from typing import Dict, Iterable, Tuple
 
-import bibtexparser
-from bibtexparser.library import Library
-from bibtexparser.model import Entry, Field
 import yaml
 
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except ImportError:  # pyarrow is optional, the stdlib csv module is the fallback
+    pa = None
+    pacsv = None
+
+
+# Blank lines separate RIS entries; tag lines hold the tag in the first
+# columns followed by "- ", continuation lines start with whitespace. The
+# value group is captured with surrounding whitespace already trimmed;
+# continuation lines are captured as a separate, optional group.
+_RIS_ENTRY_SEP = re.compile(rb"\r?\n(?:\r?\n)+")
+_RIS_TAG_RE = re.compile(
+    r"^([A-Z0-9]{1,4}) *- [ \t]*(.*?)[ \t\r]*$((?:\n(?!\S).*)*)", re.M
+)
+
 
 class RISFileReader:
     """Read a RIS file entry by entry, returning a dictionary for each entry."""
@@ -24,78 +44,141 @@ class RISFileReader:
         self.path = path
 
     def __enter__(self):
-        """Entering a RISFileReader opens the file under path (see __init__)."""
-        self.file = open(self.path, "r")
+        """Entering a RISFileReader memory-maps the file under path (see
+        __init__)."""
+        self.file = open(self.path, "rb")
+        try:
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # an empty file cannot be memory-mapped
+            self.mm = None
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        """Exiting a RISFileReader closes the file under path (see __init__)."""
+        """Exiting a RISFileReader closes the memory map and the file under
+        path (see __init__)."""
+        if self.mm is not None:
+            self.mm.close()
         self.file.close()
 
-    def __iter__(self):
-        """Initializing an iterator over a RISFileReader resets the file pointer."""
-        self.file.seek(0)
-        return self
-
-    def ris_to_dict(lines: List[str]) -> Dict[str, str]:
-        """Transforms a list of lines in RIS format to a dictionary. Multiple
-        lines for a key are split using ';' as a delimiter.
+    def ris_to_dict(blob: str) -> Dict[str, str]:
+        """Transforms a single entry in RIS format to a dictionary. Multiple
+        occurrences of a tag are joined using ';' as a delimiter, continuation
+        lines using a space.
 
         Keyword arguments:
-        lines -- List of lines in RIS format.
+        blob -- One RIS entry as a string.
 
         Returns:
         Dictionary with keys and values from RIS file.
         """
-        content = {}
-        oldkey = None  # needed for multiline entries
-        for line in lines:
-            key, value = line[0:4].strip(), line[6:].strip()
-            if key == "":
-                content[oldkey] += f" {value}"
-            else:
-                if key in content:
-                    content[key] += f"; {value}"
-                else:
-                    content[key] = value
-                oldkey = key
-        return content
-
-    def __next__(self):
-        """Iterating over a RISFileReader returns a dictionary for each entry."""
-        read_lines = []
-        for line in self.file:
-            if line.strip() == "":
-                return RISFileReader.ris_to_dict(read_lines)
-            read_lines.append(line)
-        if len(read_lines) == 0:
-            raise StopIteration
-        return RISFileReader.ris_to_dict(read_lines)
-
-
-@functools.lru_cache
-def get_syntax_map(dialect: str):
-    """Read a syntax mapping. The method ensures that we can cache the mapping.
+        parts: Dict[str, list] = {}
+        for key, value, continuation in _RIS_TAG_RE.findall(blob):
+            key = sys.intern(key)
+            if continuation:
+                value = " ".join(
+                    (value, *(part.strip() for part in continuation.splitlines()[1:]))
+                )
+            parts.setdefault(key, []).append(value)
+        return {key: "; ".join(values) for key, values in parts.items()}
+
+    def __iter__(self):
+        """Iterating over a RISFileReader yields a dictionary for each entry.
+        Entry boundaries are located on the memory-mapped bytes; only the
+        current entry is sliced out and decoded, so memory use stays
+        independent of the file size."""
+        if self.mm is None:
+            return
+        start = 0
+        end = len(self.mm)
+        separators = itertools.chain(
+            (match.span() for match in _RIS_ENTRY_SEP.finditer(self.mm)),
+            ((end, end),),
+        )
+        for sep_start, sep_end in separators:
+            blob = self.mm[start:sep_start]
+            start = sep_end
+            if blob.strip():
+                yield RISFileReader.ris_to_dict(blob.decode("utf-8"))
+
+
+def _load_yaml(path: str):
+    """Parse a YAML file, preferring the libyaml loader when available.
 
     Keyword arguments:
-    dialect -- The dialect for which the mapping should be read.
+    path -- Path to the YAML file.
     """
-    with open("syntax_mapping.yaml", "r") as syn_file:
-        syntax_map = yaml.safe_load(syn_file)[dialect]
-    return syntax_map
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, "r") as yaml_file:
+        return yaml.load(yaml_file, Loader=loader)
+
 
+_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "litexport"
+)
 
-@functools.lru_cache
-def get_semantic_map(dialect: str):
-    """Read a semantic mapping. The method ensures that we can cache the
-    mapping.
+
+def _load_yaml_cached(path: str):
+    """Load a YAML file through an on-disk pickle cache. Unpickling is about
+    an order of magnitude faster than parsing YAML, so repeated CLI
+    invocations only pay the parse cost when a mapping file changes.
+
+    Keyword arguments:
+    path -- Path to the YAML file.
+    """
+    stat = os.stat(path)
+    cache_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    cache_path = os.path.join(_CACHE_DIR, os.path.basename(path) + ".pkl")
+    try:
+        with open(cache_path, "rb") as cache_file:
+            key, data = pickle.load(cache_file)
+        if key == cache_key:
+            return data
+    except Exception:  # any unreadable or malformed cache falls back to parsing
+        pass
+    data = _load_yaml(path)
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as cache_file:
+            pickle.dump((cache_key, data), cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:  # a cache failing to write must not break the conversion
+        pass
+    return data
+
+
+def _intern_strings(obj):
+    """Recursively intern every string in a structure loaded from YAML. The
+    mapping keys are reused as dictionary keys on every row, so interned
+    copies make those lookups pointer comparisons.
 
     Keyword arguments:
-    dialect -- The dialect for which the mapping should be read.
+    obj -- An arbitrarily nested structure of dicts, lists and strings.
     """
-    with open("semantic_mapping.yaml", "r") as sem_file:
-        semantic_map = yaml.safe_load(sem_file)[dialect]
-    return semantic_map
+    if isinstance(obj, str):
+        return sys.intern(obj)
+    if isinstance(obj, dict):
+        return {_intern_strings(k): _intern_strings(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_intern_strings(v) for v in obj]
+    return obj
+
+
+# The syntax and semantic mappings live in a single YAML file that is loaded
+# exactly once per process. Syntax mappings are flattened from their
+# list-of-single-key-dicts YAML form into tuples of (source key, bib key)
+# pairs, which is what the hot loop iterates over.
+_MAPS = _intern_strings(_load_yaml_cached("mapping.yaml"))
+_SYNTAX_MAPS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    dialect: tuple(pair for synmap in synmaps for pair in synmap.items())
+    for dialect, synmaps in _MAPS["syntax"].items()
+}
+_SEMANTIC_MAPS: Dict[str, Dict[str, Dict[str, str]]] = _MAPS["semantic"]
+# The mapped field names per dialect, precomputed so semantic_map only has to
+# intersect two small key sets per entry.
+_SEMANTIC_KEYS: Dict[str, frozenset] = {
+    dialect: frozenset(mapping) for dialect, mapping in _SEMANTIC_MAPS.items()
+}
 
 
 # https://docs.python.org/3/library/itertools.html#itertools-recipes
@@ -109,21 +192,20 @@ def batched(iterable, n):
         yield batch
 
 
-def schema_map(i: int, row: dict, dialect: str):
-    """Map a row of data according to the syntax mapping defined with dialect.
+def schema_map(i: int, row: dict, syntax_map: Tuple[Tuple[str, str], ...], dialect: str):
+    """Map a row of data according to the given flattened syntax mapping.
 
     Keyword arguments:
     i -- The index of the row. Useful to autogenerate IDs.
     row -- The row of data to be mapped as a dictionary.
+    syntax_map -- The flattened (source key, bib key) pairs to apply.
     dialect -- The dialect for which the mapping should be applied.
     """
     entry = {"ID": f"{dialect}_{i}"}
-    syntax_map = get_syntax_map(dialect)
-    for synmap in syntax_map:
-        for key, bib_key in synmap.items():
-            if key not in row or row[key] == "":
-                continue
-            entry[bib_key] = row[key]
+    for key, bib_key in syntax_map:
+        value = row.get(key)
+        if value:
+            entry[bib_key] = value
     return entry
 
 
@@ -134,35 +216,23 @@ def semantic_map(entry: dict, dialect: str):
     entry -- The entry of data to be mapped as a dictionary.
     dialect -- The dialect for which the mapping should be applied.
     """
-    semantic_map = get_semantic_map(dialect)
-    for key, value in entry.items():
-        if key in semantic_map:
-            entry[key] = semantic_map[key][value]
+    semantic_map = _SEMANTIC_MAPS[dialect]
+    for key in _SEMANTIC_KEYS[dialect].intersection(entry):
+        entry[key] = semantic_map[key].get(entry[key], entry[key])
     return entry
 
 
 def clean_entry(entry: dict, dialect: str):
-    """Clean an entry according to the dialect. This is essentially a switch
-    for individual cleaning functions.
+    """Clean an entry according to the dialect. This dispatches to the
+    individual cleaning functions via _CLEANERS.
 
     Keyword arguments:
     entry -- The entry of data to be cleaned as a dictionary.
     dialect -- The dialect for which the cleaning should be applied.
     """
     # clean: only one publication title
-    if entry["ENTRYTYPE"] == "article":
-        entry.pop("booktitle", None)
-    else:
-        entry.pop("journal", None)
-    if dialect == "ieee":
-        entry = ieee_clean_entry(entry)
-    elif dialect == "scopus":
-        entry = scopus_clean_entry(entry)
-    elif dialect == "pubmed":
-        entry = pubmed_clean_entry(entry)
-    else:
-        raise ValueError(f"Unknown dialect: {dialect}")
-    return entry
+    entry.pop("booktitle" if entry["ENTRYTYPE"] == "article" else "journal", None)
+    return _CLEANERS[dialect](entry)
 
 
 def ieee_clean_entry(entry: dict):
@@ -178,16 +248,28 @@ def ieee_clean_entry(entry: dict):
     return entry
 
 
+# A Scopus author is "Last, F.I." -- a surname token followed by initials
+# ending in a dot. The lookahead keeps the separating comma for the next match.
+_SCOPUS_AUTHOR_RE = re.compile(r"([^,]+),\s*([^,]*\.)(?=,|$)")
+
+
 def scopus_author_canonicalize(authors: str):
     """Canonicalize author names from Scopus CSV files. The method returns None
-    if the author name is "[No author name available]". Moreover, it adapts to
-    incomplete names by checking for a dot in the first name.
+    if the author name is "[No author name available]". The common
+    "Last, F.I." form is extracted with a single regex pass; lists containing
+    surnames without initials (no dot in the first name) fall back to pairing
+    the comma-separated tokens positionally.
 
     Keyword arguments:
     authors -- The author names as a string.
     """
     if authors == "[No author name available]":
         return None
+    pairs = _SCOPUS_AUTHOR_RE.findall(authors)
+    if len(pairs) * 2 == authors.count(",") + 1:
+        return " and ".join(
+            f"{last.strip()}, {first.strip()}" for last, first in pairs
+        )
     author_split = authors.split(",")
     names = []
     i = 0
@@ -219,6 +301,11 @@ def scopus_clean_entry(entry: dict):
     return entry
 
 
+# Matches one article ID from the AID field whose fragment ends in the
+# [doi] marker.
+_PUBMED_DOI_RE = re.compile(r"([^;]*?)\s*\[doi\]\s*(?=;|$)")
+
+
 def pubmed_clean_entry(entry: dict):
     """Clean entries from PubMed RIS files: transform the authors field and
     clean the DOI field.
@@ -228,31 +315,40 @@ def pubmed_clean_entry(entry: dict):
         entry["author"] = entry["author"].replace("; ", " and ")
     # clean: choose DOI from the IDs field
     if "doi" in entry:
-        doi = None
-        for article_id in entry["doi"].split(";"):
-            if article_id.strip().endswith("[doi]"):
-                doi = article_id.strip()[:-5].strip()
+        dois = _PUBMED_DOI_RE.findall(entry["doi"])
+        doi = dois[-1].strip() if dois else None
         if doi:
             entry["doi"] = doi
         else:
             entry.pop("doi")
     # clean: publication date
-    if "year" in entry:
+    if "year" in entry and len(entry["year"]) > 4:
         entry["year"] = entry["year"][0:4]
     return entry
 
 
+# Dialect-specific cleaning functions, resolved by clean_entry per entry and
+# validated once per conversion in transform.
+_CLEANERS = {
+    "ieee": ieee_clean_entry,
+    "scopus": scopus_clean_entry,
+    "pubmed": pubmed_clean_entry,
+}
+
+
+# The publication types that the PubMed semantic mapping can resolve.
+_PT_CANDIDATES = frozenset(_SEMANTIC_MAPS["pubmed"]["ENTRYTYPE"])
+
+
 def pubmed_preprocess(entry: dict):
-    """Preprocess the PT field from pubmed entries: remove all publication
-    types except the first one.
+    """Preprocess the PT field from pubmed entries: keep only the first
+    recognized publication type.
     """
-    candidate_pts = get_semantic_map("pubmed")["ENTRYTYPE"].keys()
-    all_pts = entry["PT"].split("; ")
-    found_pts = set(candidate_pts) & set(all_pts)
-    if len(found_pts) > 0:
-        entry["PT"] = list(found_pts)[0]
-    else:
-        entry["PT"] = "Journal Article"
+    for pt in entry["PT"].split("; "):
+        if pt in _PT_CANDIDATES:
+            entry["PT"] = pt
+            return entry
+    entry["PT"] = "Journal Article"
     return entry
 
 
@@ -263,31 +359,123 @@ def preprocess_entry(entry: dict, dialect: str):
         return pubmed_preprocess(entry)
 
 
-def transform(dialect: str, entries: Iterable[dict]) -> Library:
-    """Iteratively transform each entry according to their dialect.
+def _process_entry(
+    indexed_row: Tuple[int, dict], dialect: str, mapped: bool = False
+) -> dict:
+    """Run the whole per-entry pipeline: preprocess, schema map, semantic map
+    and clean. Fusing the steps into a single function keeps the per-row call
+    overhead down and gives the process pool one picklable unit of work.
+
+    Keyword arguments:
+    indexed_row -- The index of the row (useful to autogenerate IDs) together
+    with the row of data to be transformed as a dictionary.
+    dialect -- The dialect for which the pipeline should be applied.
+    mapped -- Whether the row is already keyed by bib keys, making the
+    preprocess and schema map steps unnecessary.
+    """
+    i, row = indexed_row
+    if mapped:
+        entry = {"ID": f"{dialect}_{i}", **row}
+    else:
+        entry = preprocess_entry(row, dialect)
+        entry = schema_map(i, entry, _SYNTAX_MAPS[dialect], dialect)
+    entry = semantic_map(entry, dialect)
+    return clean_entry(entry, dialect)
+
+
+def transform(
+    dialect: str, entries: Iterable[dict], mapped: bool = False
+) -> Iterable[dict]:
+    """Transform each entry according to their dialect. Entries are
+    independent of each other, so they are processed in parallel across CPU
+    cores in chunks; ordering is preserved by the executor. Entries are
+    yielded one at a time so they can be written out without holding the
+    whole database in memory.
 
     Keyword arguments:
     dialect -- The dialect for which the mapping should be applied.
     entries -- The entries to iterate over.
+    mapped -- Whether the entries are already keyed by bib keys (see
+    _process_entry).
 
     Returns:
-    A Library object containing the transformed entries.
+    A generator of dictionaries with the transformed entries.
     """
-    database = Library()
-    for i, row in enumerate(entries):
-        entry = preprocess_entry(row, dialect)
-        entry = schema_map(i, entry, dialect)
-        entry = semantic_map(entry, dialect)
-        entry = clean_entry(entry, dialect)
-        entry_lib = Entry(
-            entry_type=entry["ENTRYTYPE"],
-            key=entry["ID"],
-            fields=[
-                Field(k, v) for k, v in entry.items() if k not in ["ENTRYTYPE", "ID"]
-            ],
-        )
-        database.add(entry_lib)
-    return database
+    if dialect not in _CLEANERS:
+        raise ValueError(f"Unknown dialect: {dialect}")
+    worker = functools.partial(_process_entry, dialect=dialect, mapped=mapped)
+    with multiprocessing.Pool() as pool:
+        yield from pool.imap(worker, enumerate(entries), chunksize=512)
+
+
+def write_bibtex(bibfile: str, entries: Iterable[dict]):
+    """Write entries to a BibTeX file as they are produced, keeping only a
+    single serialized entry in memory at a time. Values are enclosed in
+    braces; entries are separated by a blank line.
+
+    Keyword arguments:
+    bibfile -- Path to BibTeX file.
+    entries -- The entries to write.
+    """
+    with open(bibfile, "w") as out:
+        for i, entry in enumerate(entries):
+            if i:
+                out.write("\n\n")
+            out.write(f"@{entry['ENTRYTYPE']}{{{entry['ID']},\n")
+            fields = ",\n".join(
+                f"\t{key} = {{{value}}}"
+                for key, value in entry.items()
+                if key not in ("ID", "ENTRYTYPE")
+            )
+            if fields:
+                out.write(f"{fields}\n")
+            out.write("}\n")
+
+
+def _csv_rows(f, dialect: str) -> Iterable[dict]:
+    """Yield CSV rows as dictionaries already keyed by their bib keys. Only
+    the columns referenced by the dialect's syntax mapping are extracted, by
+    position, so no per-row dictionary of unused columns is built.
+
+    Keyword arguments:
+    f -- An open CSV file object positioned at the header row.
+    dialect -- Format of the input file.
+    """
+    reader = csv.reader(f, delimiter=",")
+    header = [sys.intern(name) for name in next(reader, [])]
+    wanted = tuple(
+        (bib_key, header.index(key))
+        for key, bib_key in _SYNTAX_MAPS[dialect]
+        if key in header
+    )
+    for row in reader:
+        yield {bib_key: row[i] for bib_key, i in wanted if i < len(row) and row[i]}
+
+
+def _arrow_csv_rows(csvfile: str) -> Iterable[dict]:
+    """Yield CSV rows as dictionaries using the pyarrow CSV reader. All
+    columns are read as strings so that downstream cleaning sees the same
+    values as with the stdlib reader.
+
+    Keyword arguments:
+    csvfile -- Path to CSV.
+    """
+    with open(csvfile, "r", encoding="utf-8-sig", newline="") as f:
+        header = next(csv.reader(f), None)
+    if header is None:  # an empty file yields no rows, like the stdlib path
+        return
+    convert_options = pacsv.ConvertOptions(
+        column_types={name: pa.string() for name in header}
+    )
+    read_options = pacsv.ReadOptions(block_size=1 << 20)
+    with open(csvfile, "rb") as f:
+        if f.read(len(codecs.BOM_UTF8)) != codecs.BOM_UTF8:
+            f.seek(0)
+        with pacsv.open_csv(
+            f, read_options=read_options, convert_options=convert_options
+        ) as reader:
+            for batch in reader:
+                yield from batch.to_pylist()
 
 
 def convert_csv(dialect: str, csvfile: str, bibfile: str):
@@ -298,14 +486,14 @@ def convert_csv(dialect: str, csvfile: str, bibfile: str):
     csvfile -- Path to CSV.
     bibfile -- Path to BibTeX file.
     """
-    with open(csvfile, "r") as f:
-        bom = f.read(1)
-        if bom != "\ufeff":
-            f.seek(0)
-        reader = csv.DictReader(f, delimiter=",")
-        database = transform(dialect, reader)
-
-    bibtexparser.write_file(bibfile, database)
+    if pacsv is not None:
+        write_bibtex(bibfile, transform(dialect, _arrow_csv_rows(csvfile)))
+    else:
+        # A binary read with a large buffer plus one bulk decode is markedly
+        # cheaper than text-mode line reads; utf-8-sig swallows a leading BOM.
+        with open(csvfile, "rb", buffering=1 << 20) as raw:
+            f = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+            write_bibtex(bibfile, transform(dialect, _csv_rows(f, dialect), mapped=True))
 
 
 def convert_ris(dialect: str, risfile: str, bibfile: str):
@@ -317,8 +505,7 @@ def convert_ris(dialect: str, risfile: str, bibfile: str):
         bibfile -- Path to BibTeX file.
     """
     with RISFileReader(risfile) as ris:
-        database = transform(dialect, ris)
-    bibtexparser.write_file(bibfile, database)
+        write_bibtex(bibfile, transform(dialect, ris))
 
 
 if __name__ == "__main__":